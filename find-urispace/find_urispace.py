@@ -1,54 +1,282 @@
-from rdflib import Graph, URIRef
 from collections import Counter
+from pathlib import Path
+from urllib.parse import urljoin
 import re
+import xml.sax
 
-def find_urispace(data, extension):
+# optional, pyoxigraph's streaming parser is used when it is installed
+try:
+    import pyoxigraph
+except ImportError:
+    pyoxigraph = None
+# RdfFormat and parse(path=..., format=...) only exist from pyoxigraph 0.4 on, older versions use the fallbacks
+if pyoxigraph is not None and not hasattr(pyoxigraph, "RdfFormat"):
+    pyoxigraph = None
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# Turtle/N-Triples tokens, an unterminated string ("open") means it continues on the next line
+TOKEN = re.compile(rb"""
+    (?P<space>\s+|\#[^\n]*)
+  | (?P<iri><[^>\s]*>)
+  | (?P<string>\"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*'''|"(?!"")(?:[^"\\\n]|\\.)*"|'(?!'')(?:[^'\\\n]|\\.)*')
+  | (?P<open>\"\"\"|'''|"|')
+  | (?P<punct>[;,\[\]()])
+  | (?P<word>[^\s<>"'\[\](),;\#]+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# RDF/XML syntax attributes that do not produce a triple of their own
+SYNTAX_ATTRIBUTES = {
+    (RDF_NS, local)
+    for local in ('about', 'ID', 'nodeID', 'resource', 'parseType', 'datatype', 'bagID', 'aboutEach', 'aboutEachPrefix')
+}
+
+
+def turtle_tokens(file):
     """
-    finds URISpace of SKOS file
-    input: data and file extension, only allowed is rdf or ttl
-    returns: most common base URI, if multiple are found, the first one is returned, if nothing is found, None is returned
+    yields (kind, value) tokens of a Turtle or N-Triples file read line by line, comments and whitespace are dropped
+    a '.' ending a word is returned as a separate statement terminator
     """
-    
-    g = Graph()
-    if extension == 'rdf':
-        g.parse(data, format="xml")
-    elif extension == 'ttl':
-        g.parse(data, format="ttl")
-    else:
-        raise ValueError('invalid format')
+    buffer = b''
+    for line in file:
+        buffer += line
+        pos = 0
+        while pos < len(buffer):
+            token = TOKEN.match(buffer, pos)
+            kind = token.lastgroup
+            if kind == 'open':
+                # string spans several lines, read on and tokenize again from its start
+                break
+            pos = token.end()
+            value = token.group(kind)
+            if kind == 'word' and value.endswith(b'.'):
+                word = value.rstrip(b'.')
+                if word:
+                    yield 'word', word
+                for _ in range(len(value) - len(word)):
+                    yield 'punct', b'.'
+            elif kind != 'space':
+                yield kind, value
+        buffer = buffer[pos:]
+
 
-    # Create a dictionary of all namespace prefixes to their full URIs
-    namespace_map = {prefix: str(ns) for prefix, ns in g.namespaces()}
+def turtle_subjects(path):
+    """
+    yields the subject URIs of a Turtle or N-Triples file without building a graph, one entry per triple
+    relative IRIs are resolved against @base or the file location, prefixed names are expanded with the @prefix declarations
+    blank nodes and the triples inside [ ] and ( ) are skipped, as they have no subject URI
+    """
+    base = Path(path).absolute().as_uri()
+    prefixes = {}
+
+    def resolve(kind, value):
+        if kind == 'iri':
+            return urljoin(base, value[1:-1].decode('utf-8'))
+        if kind == 'word' and b':' in value:
+            name, local_part = value.split(b':', 1)
+            if name in prefixes:
+                return prefixes[name] + local_part.decode('utf-8')
+        return None
+
+    # state is one of subject, directive, predicate, object and after_object
+    state = 'subject'
+    subject = None
+    directive = None
+    prefix_name = None
+    # nesting depth of [ ] and ( ), whatever is inside belongs to a blank node
+    depth = 0
+    with open(path, 'rb') as file:
+        for kind, value in turtle_tokens(file):
+            if depth:
+                if value in (b'[', b'('):
+                    depth += 1
+                elif value in (b']', b')'):
+                    depth -= 1
+                    if not depth:
+                        state = 'predicate' if state == 'subject' else 'after_object'
+                continue
+            if state == 'directive':
+                if kind == 'iri':
+                    iri = urljoin(base, value[1:-1].decode('utf-8'))
+                    if directive == b'prefix':
+                        prefixes[prefix_name] = iri
+                    else:
+                        base = iri
+                    state = 'subject'
+                else:
+                    prefix_name = value.rstrip(b':')
+                continue
+            if state == 'subject':
+                if value.lower() in (b'@prefix', b'prefix', b'@base', b'base'):
+                    directive = value.lower().lstrip(b'@')
+                    state = 'directive'
+                elif value in (b'[', b'('):
+                    subject = None
+                    depth = 1
+                elif value != b'.':
+                    subject = resolve(kind, value)
+                    state = 'predicate'
+            elif state == 'predicate':
+                if value == b'.':
+                    state = 'subject'
+                elif value != b';':
+                    state = 'object'
+            elif state == 'object':
+                # every object is one triple of the current subject
+                if subject is not None:
+                    yield subject
+                if value in (b'[', b'('):
+                    depth = 1
+                state = 'after_object'
+            elif value == b',':
+                state = 'object'
+            elif value == b';':
+                state = 'predicate'
+            elif value == b'.':
+                state = 'subject'
+            # anything else after an object is a language tag or datatype
+
+
+def is_property_attribute(key):
+    # RDF/XML attributes in a namespace other than xml that are not syntax attributes each produce a triple
+    namespace, _ = key
+    return namespace not in (None, XML_NS) and key not in SYNTAX_ATTRIBUTES
+
+
+class RdfXmlSubjectHandler(xml.sax.ContentHandler):
+    """
+    collects the subject URIs of an RDF/XML file without building a graph, one entry per triple
+    node elements take their subject from rdf:about or rdf:ID, relative URIs are resolved against xml:base
+    """
 
+    def __init__(self, base=''):
+        super().__init__()
+        self.bases = [base]
+        # one (kind, subject) frame per open element, kind is rdf, node, property, resource, collection or literal
+        self.stack = []
+        self.subjects = []
 
-    # Collect all URIs directly from subjects, expand prefixed URIs
-    uris = []
-    for subject in g.subjects():
-        # Only consider subject of type URIRef
-        if isinstance(subject, URIRef):
-            # Convert URIRef to a string for processing
-            uri_str = str(subject)
-            # Check if the URI contains a namespace prefix that needs expansion
-            # URIs without prefix typically contain '//' but no ':' from http:// or https://
-            if ':' in uri_str and '//' not in uri_str:
-                # Attempt to expand based on namespace prefix
-                prefix, local_part = uri_str.split(':', 1)
-                if prefix in namespace_map:
-                    # Use the dictionary to expand the prefix
-                    uri_str = namespace_map[prefix] + local_part
-            uris.append(uri_str)
+    def resolve(self, base, uri):
+        # absolute http(s) URIs, the usual case in SKOS, are taken as they are
+        if base and not uri.startswith(('http://', 'https://')):
+            return urljoin(base, uri)
+        return uri
 
+    def startElementNS(self, name, qname, attrs):
+        base = attrs.get((XML_NS, 'base'))
+        base = urljoin(self.bases[-1], base) if base is not None else self.bases[-1]
+        self.bases.append(base)
+        parent = self.stack[-1][0] if self.stack else None
+        if parent is None and name == (RDF_NS, 'RDF'):
+            self.stack.append(('rdf', None))
+        elif parent == 'literal':
+            self.stack.append(('literal', None))
+        elif parent in (None, 'rdf', 'property', 'collection'):
+            self.node_element(name, attrs, base)
+        else:
+            self.property_element(attrs, base)
 
+    def node_element(self, name, attrs, base):
+        subject = None
+        if (RDF_NS, 'about') in attrs:
+            subject = self.resolve(base, attrs[(RDF_NS, 'about')])
+        elif (RDF_NS, 'ID') in attrs:
+            subject = urljoin(base, '#' + attrs[(RDF_NS, 'ID')])
+        if subject is not None:
+            # a typed node element adds an rdf:type triple, every property attribute one more
+            triples = name != (RDF_NS, 'Description')
+            triples += sum(1 for key in attrs.keys() if is_property_attribute(key))
+            self.subjects.extend([subject] * triples)
+        self.stack.append(('node', subject))
+
+    def property_element(self, attrs, base):
+        # every property element is one triple of the enclosing node
+        subject = self.stack[-1][1]
+        if subject is not None:
+            self.subjects.append(subject)
+        if (RDF_NS, 'ID') in attrs:
+            # reified statement: rdf:type, rdf:subject, rdf:predicate and rdf:object
+            self.subjects.extend([urljoin(base, '#' + attrs[(RDF_NS, 'ID')])] * 4)
+        parse_type = attrs.get((RDF_NS, 'parseType'))
+        if parse_type == 'Resource':
+            self.stack.append(('resource', None))
+        elif parse_type == 'Collection':
+            self.stack.append(('collection', None))
+        elif parse_type is not None:
+            self.stack.append(('literal', None))
+        else:
+            # property attributes on a property element describe its rdf:resource
+            if (RDF_NS, 'resource') in attrs:
+                resource = self.resolve(base, attrs[(RDF_NS, 'resource')])
+                triples = sum(1 for key in attrs.keys() if is_property_attribute(key))
+                self.subjects.extend([resource] * triples)
+            self.stack.append(('property', None))
+
+    def endElementNS(self, name, qname):
+        self.bases.pop()
+        self.stack.pop()
+
+
+def rdfxml_subjects(path):
+    """
+    returns the subject URIs of an RDF/XML file, parsed with SAX so no graph is built
+    relative URIs without xml:base are resolved against the file location
+    """
+    handler = RdfXmlSubjectHandler(Path(path).absolute().as_uri())
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    parser.setContentHandler(handler)
+    parser.parse(path)
+    return handler.subjects
+
+
+def oxigraph_subjects(path, extension):
+    """
+    yields the subject URIs of an RDF file with pyoxigraph's streaming parser, no store is built
+    """
+    rdf_format = {
+        'rdf': pyoxigraph.RdfFormat.RDF_XML,
+        'ttl': pyoxigraph.RdfFormat.TURTLE,
+        'nt': pyoxigraph.RdfFormat.N_TRIPLES,
+    }[extension]
+    # relative IRIs are resolved against the file location, as rdflib does
+    base_iri = Path(path).absolute().as_uri()
+    for quad in pyoxigraph.parse(path=path, format=rdf_format, base_iri=base_iri):
+        subject = quad.subject
+        if isinstance(subject, pyoxigraph.NamedNode):
+            yield subject.value
+
+
+def find_urispace(data, extension):
+    """
+    finds URISpace of SKOS file
+    input: data and file extension, only allowed is rdf, ttl or nt
+    returns: most common base URI, if multiple are found, the first one is returned, if nothing is found, None is returned
+    """
+
+    if extension not in ('rdf', 'ttl', 'nt'):
+        raise ValueError('invalid format')
+
+    # Collect all subject URIs while streaming through the file, no graph is built
+    # pyoxigraph is a full parser, the fallbacks only look at what is needed to find the subjects
+    if pyoxigraph is not None:
+        uris = oxigraph_subjects(data, extension)
+    elif extension == 'rdf':
+        uris = rdfxml_subjects(data)
+    else:
+        uris = turtle_subjects(data)
 
     # Use regular expressions to extract the base URI from each full URI
     # finds URIs with up to 4 slashes after the domain name
     # can be adjusted in the {1,4} part
-    pattern = re.compile(r'(https?://[^/]+(?:/[^/]+){0,4}/)')
-    uri_prefixes = [pattern.match(uri) for uri in uris]
-    uri_prefixes = [match.group(1) for match in uri_prefixes if match]
+    # the URIs are joined into one newline separated buffer so a single findall does the matching
+    pattern = re.compile(r'(?m)^(https?://[^/\n]+(?:/[^/\n]+){0,4}/)')
+    blob = '\n'.join(uris)
 
     # Count occurrences of each base URI and find the most common
-    prefix_count = Counter(uri_prefixes)
+    prefix_count = Counter(pattern.findall(blob))
     most_common_prefix = prefix_count.most_common(1)
 
     # Return the most common base URI
@@ -59,5 +287,6 @@ def find_urispace(data, extension):
         return None
 
 
-# Replace 'path_to_your_file.rdf' with the path to your RDF/XML file
-find_urispace('path_to_your_file.rdf', 'rdf')
+if __name__ == "__main__":
+    # Replace 'path_to_your_file.rdf' with the path to your RDF/XML file
+    find_urispace('path_to_your_file.rdf', 'rdf')
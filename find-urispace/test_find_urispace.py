@@ -0,0 +1,127 @@
+from collections import Counter
+
+import pytest
+
+import find_urispace
+
+rdflib = pytest.importorskip("rdflib")
+
+TURTLE_CASES = {
+    "prefixes_and_lists": """
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix ex: <http://example.org/voc/> .
+ex:c1 a skos:Concept ;
+    skos:prefLabel "one"@en , "eins"@de ;
+    skos:definition \"\"\"spans
+several lines. \"\"\"@en ;
+    skos:broader ex:c0 ;
+    .
+ex:c0 skos:prefLabel 'zero' ; skos:notation "0"^^<http://www.w3.org/2001/XMLSchema#string>.
+""",
+    "comment_after_statement": """
+<http://a.org/x/s1> <http://a.org/x/p> <http://a.org/x/o> . # note
+<http://b.org/y/s2> <http://a.org/x/p> <http://a.org/x/o> .
+""",
+    "base": """
+@base <http://c.org/voc/> .
+<s1> <p> <o> .
+BASE <http://d.org/voc/>
+PREFIX ex: <sub/>
+<s2> <p> ex:o ; <p> <o2> .
+ex:s3 <p> "x" .
+""",
+    "blank_nodes_and_collections": """
+@prefix ex: <http://example.org/voc/> .
+ex:s ex:p [ ex:q ex:r ; ex:t [ ex:u ex:v ] ] , ex:w ;
+    ex:list ( ex:a ex:b ) .
+[ ex:p ex:o ] ex:q ex:s .
+_:b1 ex:p ex:o .
+ex:z ex:p -1.5, 2 .
+""",
+}
+
+RDFXML_CASES = {
+    "typed_nodes_and_attributes": """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:skos="http://www.w3.org/2004/02/skos/core#">
+  <skos:Concept rdf:about="http://a.org/x/c1" skos:notation="1">
+    <skos:prefLabel xml:lang="en">one</skos:prefLabel>
+    <skos:prefLabel xml:lang="de">eins</skos:prefLabel>
+    <skos:broader>
+      <skos:Concept rdf:about="http://a.org/x/c0"><skos:prefLabel>zero</skos:prefLabel></skos:Concept>
+    </skos:broader>
+    <skos:related rdf:resource="http://b.org/y/c2" skos:notation="2"/>
+  </skos:Concept>
+  <rdf:Description rdf:about="http://b.org/y/c3">
+    <skos:note rdf:parseType="Literal"><b>bold</b></skos:note>
+    <skos:member rdf:parseType="Resource"><skos:note>inner</skos:note></skos:member>
+    <skos:memberList rdf:parseType="Collection">
+      <rdf:Description rdf:about="http://b.org/y/c4"/>
+    </skos:memberList>
+  </rdf:Description>
+</rdf:RDF>
+""",
+    "rdf_id_and_base": """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:skos="http://www.w3.org/2004/02/skos/core#"
+         xml:base="http://c.org/voc/">
+  <skos:Concept rdf:ID="a"><skos:prefLabel>a</skos:prefLabel></skos:Concept>
+  <skos:Concept rdf:ID="b"><skos:prefLabel>b</skos:prefLabel></skos:Concept>
+  <skos:Concept rdf:about="#local"/>
+  <skos:Concept rdf:about="http://d.org/voc/c"><skos:prefLabel>c</skos:prefLabel></skos:Concept>
+</rdf:RDF>
+""",
+}
+
+
+def rdflib_subjects(path, rdf_format):
+    graph = rdflib.Graph()
+    graph.parse(str(path), format=rdf_format)
+    return Counter(str(s) for s in graph.subjects() if isinstance(s, rdflib.URIRef))
+
+
+@pytest.mark.parametrize("name", TURTLE_CASES)
+def test_turtle_subjects_match_rdflib(tmp_path, name):
+    path = tmp_path / "input.ttl"
+    path.write_text(TURTLE_CASES[name])
+    assert Counter(find_urispace.turtle_subjects(str(path))) == rdflib_subjects(path, "turtle")
+
+
+@pytest.mark.parametrize("name", RDFXML_CASES)
+def test_rdfxml_subjects_match_rdflib(tmp_path, name):
+    path = tmp_path / "input.rdf"
+    path.write_text(RDFXML_CASES[name])
+    assert Counter(find_urispace.rdfxml_subjects(str(path))) == rdflib_subjects(path, "xml")
+
+
+def test_subjects_are_counted_per_triple(tmp_path, monkeypatch):
+    # one subject with many labels outweighs several subjects with one label each
+    labels = " , ".join('"l{}"'.format(i) for i in range(8))
+    path = tmp_path / "input.ttl"
+    path.write_text(
+        "<http://a.org/x/s> <http://a.org/x/label> {} .\n".format(labels)
+        + "".join("<http://b.org/y/s{}> <http://a.org/x/label> \"l\" .\n".format(i) for i in range(3))
+    )
+    monkeypatch.setattr(find_urispace, "pyoxigraph", None)
+    assert find_urispace.find_urispace(str(path), "ttl") == "http://a.org/x/"
+
+
+def test_rdf_id_subjects(tmp_path, monkeypatch):
+    path = tmp_path / "input.rdf"
+    path.write_text(RDFXML_CASES["rdf_id_and_base"])
+    monkeypatch.setattr(find_urispace, "pyoxigraph", None)
+    assert find_urispace.find_urispace(str(path), "rdf") == "http://c.org/voc/"
+
+
+@pytest.mark.parametrize("extension, content", [
+    # relative IRIs without a base are resolved against the file location
+    ("ttl", "<#local> <http://a.org/x/p> <http://a.org/x/o> .\n"),
+    ("rdf", RDFXML_CASES["rdf_id_and_base"]),
+])
+def test_oxigraph_subjects_match_rdflib(tmp_path, extension, content):
+    if find_urispace.pyoxigraph is None:
+        pytest.skip("pyoxigraph >= 0.4 is not installed")
+    path = tmp_path / ("input." + extension)
+    path.write_text(content)
+    rdf_format = "turtle" if extension == "ttl" else "xml"
+    assert Counter(find_urispace.oxigraph_subjects(str(path), extension)) == rdflib_subjects(path, rdf_format)
@@ -1,28 +1,173 @@
-def find_unique_lines(file1_path, file2_path, output_file_path):
+from itertools import islice
+import heapq
+import mmap
+import multiprocessing as mp
+import os
+import tempfile
+
+# Combined size of both files in bytes from which find_unique_lines reads them with a pool of worker processes
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+
+def _read_lines(path):
+    # yield the lines of a file as bytes without newline characters
+    with open(path, 'rb') as file:
+        for line in file:
+            yield line.rstrip(b'\r\n')
+
+
+def _chunk_bounds(path, chunks):
+    # split a file into about the given number of byte ranges, each ending at a newline
+    size = os.path.getsize(path)
+    bounds = []
+    if size == 0:
+        return bounds
+    step = max(size // chunks, 1)
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = start + step
+            if end >= size:
+                end = size
+            else:
+                newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+            bounds.append((path, start, end))
+            start = end
+    return bounds
+
+
+def _chunk_lines(bounds):
+    # the lines of one byte range of a file without newline characters
+    path, start, end = bounds
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[start:end].splitlines()
+
+
+def _line_set(bounds):
+    # the distinct lines of one byte range of a file, runs in a worker process
+    return set(_chunk_lines(bounds))
+
+
+def _parallel_line_set(pool, path, chunks):
+    # collect the distinct lines of a file, its chunks are read in parallel
+    lines = set()
+    for chunk_lines in pool.imap_unordered(_line_set, _chunk_bounds(path, chunks)):
+        lines.update(chunk_lines)
+    return lines
+
+
+def find_unique_lines(file1_path, file2_path, output_file_path, processes=1):
     """
     This function finds unique lines that are present in only one of the two given files.
     Used for debugging the output of hierarchy.py
+    The unique lines of the first file are written first, followed by those of the second file, both in their original order.
+    With more than one process and files of at least PARALLEL_THRESHOLD bytes together, both files are memory-mapped
+    and split into chunks, a pool of worker processes collects the distinct lines of each chunk.
+    Starting the pool re-imports the calling script on platforms that spawn processes (Windows, macOS),
+    so call it with processes other than 1 only from under an if __name__ == "__main__": guard.
     Args:
         file1_path (str): Path to the first input file.
         file2_path (str): Path to the second input file.
         output_file_path (str): Path to the output file where unique lines will be saved.
+        processes (int, optional): Number of worker processes, None for the number of CPUs.
+                                   Defaults to 1, both files are then read in this process.
     Returns:
         str: A message indicating completion and the name of the output file.
     """
-    # Read lines from the first file and remove newline characters
-    with open(file1_path, 'r') as file:
-        lines_file1 = set(file.read().splitlines())
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or os.path.getsize(file1_path) + os.path.getsize(file2_path) < PARALLEL_THRESHOLD:
+        # Read lines from both files and remove newline characters
+        with open(file1_path, 'rb') as file:
+            lines_file1 = file.read().splitlines()
+        with open(file2_path, 'rb') as file:
+            lines_file2 = file.read().splitlines()
+        
+        # Find lines that are unique to each file, keeping their order, the sets are only used for lookups
+        lookup_file1 = set(lines_file1)
+        lookup_file2 = set(lines_file2)
+        unique_lines = [line for line in lines_file1 if line not in lookup_file2] + [line for line in lines_file2 if line not in lookup_file1]
+        
+        # Write unique lines to the output file
+        with open(output_file_path, 'wb') as file:
+            if unique_lines:
+                file.write(b'\n'.join(unique_lines) + b'\n')
+        return f"Unique lines written to {output_file_path}"
     
-    # Read lines from the second file and remove newline characters
-    with open(file2_path, 'r') as file:
-        lines_file2 = set(file.read().splitlines())
+    # Collect the distinct lines of both files, each file is split into a few chunks per worker
+    with mp.Pool(processes) as pool:
+        lookup_file1 = _parallel_line_set(pool, file1_path, processes * 4)
+        lookup_file2 = _parallel_line_set(pool, file2_path, processes * 4)
     
-    # Find lines that are unique to each file (symmetric difference)
-    unique_lines = lines_file1.symmetric_difference(lines_file2)
+    # Write unique lines to the output file, re-reading each file to keep the original order
+    with open(output_file_path, 'wb') as file:
+        for path, other in ((file1_path, lookup_file2), (file2_path, lookup_file1)):
+            for chunk in _chunk_bounds(path, processes * 4):
+                file.writelines(line + b'\n' for line in _chunk_lines(chunk) if line not in other)
     
-    # Write unique lines to the output file
-    with open(output_file_path, 'w') as file:
-        for line in unique_lines:
-            file.write(f"{line}\n")
+    return f"Unique lines written to {output_file_path}"
+
+
+def _sorted_runs(path, chunk_lines, tmpdir):
+    # split a file into sorted, deduplicated runs of at most chunk_lines lines, written to tmpdir
+    runs = []
+    with open(path, 'rb') as file:
+        while True:
+            lines = [line.rstrip(b'\r\n') for line in islice(file, chunk_lines)]
+            if not lines:
+                return runs
+            fd, run_path = tempfile.mkstemp(dir=tmpdir)
+            with os.fdopen(fd, 'wb') as run:
+                run.writelines(line + b'\n' for line in sorted(set(lines)))
+            runs.append(run_path)
+
+
+def _sorted_unique_lines(path, chunk_lines, tmpdir):
+    # yield the distinct lines of a file in sorted order, merging the sorted runs
+    previous = None
+    for line in heapq.merge(*(_read_lines(run) for run in _sorted_runs(path, chunk_lines, tmpdir))):
+        if line != previous:
+            yield line
+            previous = line
+
+
+def find_unique_lines_sorted(file1_path, file2_path, output_file_path, chunk_lines=1000000):
+    """
+    This function finds unique lines that are present in only one of the two given files, for files too large for find_unique_lines.
+    Both files are sorted externally in runs of chunk_lines lines and then walked in lock-step, so memory use is bounded by chunk_lines.
+    Unlike find_unique_lines the output is sorted and contains every unique line only once.
+    Args:
+        file1_path (str): Path to the first input file.
+        file2_path (str): Path to the second input file.
+        output_file_path (str): Path to the output file where unique lines will be saved.
+        chunk_lines (int, optional): Number of lines sorted in memory at a time.
+    Returns:
+        str: A message indicating completion and the name of the output file.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir, open(output_file_path, 'wb') as file:
+        lines_file1 = _sorted_unique_lines(file1_path, chunk_lines, tmpdir)
+        lines_file2 = _sorted_unique_lines(file2_path, chunk_lines, tmpdir)
+        line1 = next(lines_file1, None)
+        line2 = next(lines_file2, None)
+        
+        # Lines present in both files are skipped, the smaller line is unique to its file
+        while line1 is not None and line2 is not None:
+            if line1 == line2:
+                line1 = next(lines_file1, None)
+                line2 = next(lines_file2, None)
+            elif line1 < line2:
+                file.write(line1 + b'\n')
+                line1 = next(lines_file1, None)
+            else:
+                file.write(line2 + b'\n')
+                line2 = next(lines_file2, None)
+        
+        # Whatever is left in one of the files is unique
+        if line1 is not None:
+            file.write(line1 + b'\n')
+            file.writelines(line + b'\n' for line in lines_file1)
+        if line2 is not None:
+            file.write(line2 + b'\n')
+            file.writelines(line + b'\n' for line in lines_file2)
     
     return f"Unique lines written to {output_file_path}"
@@ -1,13 +1,35 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from itertools import compress
 from rdflib import Graph, Namespace, URIRef, RDF
+from rdflib.util import guess_format
 from os.path import splitext
 
-def filter_skos(input_file, output_file, top_concept_uri):
+SKOS = Namespace("http://www.w3.org/2004/02/skos/core#")
+# looked up once at module load instead of going through the namespace on every use
+_BROADER = SKOS["broader"]
+_NARROWER = SKOS["narrower"]
+_MEMBER = SKOS["member"]
+_COLLECTION = SKOS["Collection"]
+_CONCEPT_SCHEME = SKOS["ConceptScheme"]
+_IN_SCHEME = SKOS["inScheme"]
+
+# file extension of the default output filename for non RDF/XML output formats
+OUTPUT_EXTENSIONS = {"turtle": ".ttl", "nt": ".nt"}
+
+# traversal directions in the hierarchy, used as bit flags
+UP = 1
+DOWN = 2
+
+def filter_skos(input_file, output_file, top_concept_uri, store="default", output_format="xml"):
     """
     arguments:
     - input_file (required): path to input file in SKOS rdf/xml (other serializations are untested but might work), e.g. "files/input.rdf"
     - output_file (required): path for output file, e.g. "files/output.pdf"
     - top_concept_uri (required): URI of desired to concept
+    - store (optional): rdflib store plugin holding the graph, e.g. "Oxigraph" (requires oxrdflib) for faster parsing and lower memory use on large files, defaults to rdflib's in-memory store
+    - output_format (optional): rdflib serialization of the output file, defaults to "xml" (RDF/XML), "nt" writes one triple per line and needs the least memory on large files
 
     return:
         None
@@ -25,91 +47,184 @@ def filter_skos(input_file, output_file, top_concept_uri):
     comments:
     - it keeps skos:collections if they have "skos:broader" to one of the concepts to keep or the top concept itself even though broader/narrower is not allowed by SKOS (see 9.6.4 in https://www.w3.org/TR/skos-reference/#collections)
     """
-    skos = Namespace("http://www.w3.org/2004/02/skos/core#")
-    # find narrower concepts recursively
-    def find_narrower(graph, concept, concepts_to_keep):
-        for s, p, o in graph.triples((None, skos["broader"], concept)):
-            concepts_to_keep.add(s)
-            find_narrower(graph, s, concepts_to_keep)
-
-    # find broader concepts recursively
-    def find_broader(graph, concept, concepts_to_keep):
-        for s, p, o in graph.triples((concept, skos["broader"], None)):
-            concepts_to_keep.add(o)
-            find_broader(graph, o, concepts_to_keep)
-   
-    # New function to find members of a collection recursively
-    def find_collection_members(graph, collection, concepts_to_keep):
-        for _, _, member in graph.triples((collection, skos["member"], None)):
-            concepts_to_keep.add(member)  # Add the member to concepts to keep
-            find_narrower(graph, member, concepts_to_keep)  # Recursively find narrower concepts
-            find_broader(graph, member, concepts_to_keep)  # Recursively find broader concepts
-            if (member, RDF.type, skos["Collection"]) in graph:  # If the member is also a collection
-                find_collection_members(graph, member, concepts_to_keep)  # Recursive call for nested collections
-
-    skos_graph = Graph()
-    skos_graph.parse(input_file)
+    # every node of the hierarchy is interned to a small integer id, the traversal only works on ids
+    ids = {}
+    nodes = []
+
+    def intern(node):
+        node_id = ids.get(node)
+        if node_id is None:
+            node_id = ids[node] = len(nodes)
+            nodes.append(node)
+        return node_id
+
+    # build a compressed sparse row adjacency from (source, target) id pairs
+    # the neighbours of id n are indices[indptr[n]:indptr[n + 1]], two flat int arrays instead of a list per node
+    def csr(edges):
+        indptr = array('i', [0]) * (len(nodes) + 1)
+        for source, _ in edges:
+            indptr[source + 1] += 1
+        for node_id in range(len(nodes)):
+            indptr[node_id + 1] += indptr[node_id]
+        indices = array('i', [0]) * len(edges)
+        fill = indptr[:-1]
+        for source, target in edges:
+            indices[fill[source]] = target
+            fill[source] += 1
+        return indptr, indices
+
+    # find all ids reachable from seeds by following the adjacency (iterative, no recursion)
+    # returns a bytearray of visited flags indexed by id
+    def bfs(seeds, adjacency):
+        indptr, indices = adjacency
+        visited = bytearray(len(nodes))
+        queue = array('i', seeds)
+        head = 0
+        while head < len(queue):
+            node_id = queue[head]
+            head += 1
+            for neighbour in indices[indptr[node_id]:indptr[node_id + 1]]:
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    queue.append(neighbour)
+        return visited
+
+    # walk up (broader) and down (narrower) from the seeds in a single sweep over one frontier
+    # visited holds a flag per direction, a node reached going up is not expanded downwards (that would pull in siblings)
+    # returns a bytearray of visited flags indexed by id, seeds included
+    def walk_hierarchy(seeds):
+        broader_ptr, broader_indices = broader_of
+        narrower_ptr, narrower_indices = narrower_of
+        visited = bytearray(len(nodes))
+        frontier = []
+        for seed in seeds:
+            visited[seed] = UP | DOWN
+            frontier.append((seed, UP | DOWN))
+        while frontier:
+            next_frontier = []
+            for node_id, direction in frontier:
+                if direction & UP:
+                    for neighbour in broader_indices[broader_ptr[node_id]:broader_ptr[node_id + 1]]:
+                        if not visited[neighbour] & UP:
+                            visited[neighbour] |= UP
+                            next_frontier.append((neighbour, UP))
+                if direction & DOWN:
+                    for neighbour in narrower_indices[narrower_ptr[node_id]:narrower_ptr[node_id + 1]]:
+                        if not visited[neighbour] & DOWN:
+                            visited[neighbour] |= DOWN
+                            next_frontier.append((neighbour, DOWN))
+            frontier = next_frontier
+        return visited
+
+    skos_graph = Graph(store=store)
+    input_format = guess_format(input_file)
+    if store.lower() == "oxigraph" and input_format in ("xml", "turtle", "nt"):
+        # parse with oxrdflib's native parser straight into the Oxigraph store
+        skos_graph.parse(input_file, format="ox-" + input_format)
+    else:
+        skos_graph.parse(input_file)
 
+    desired_top_concept = URIRef(top_concept_uri)
+    top_id = intern(desired_top_concept)
 
+    # collect the hierarchy edges as id pairs in a single scan of the skos:broader triples
+    broader_edges = [(intern(s), intern(o)) for s, _, o in skos_graph.triples((None, _BROADER, None))]
 
-    desired_top_concept = URIRef(top_concept_uri)
+    # members are followed for the top concept and for nested collections only
+    member_edges = [
+        (intern(s), intern(o))
+        for s, _, o in skos_graph.triples((None, _MEMBER, None))
+        if s == desired_top_concept or (s, RDF.type, _COLLECTION) in skos_graph
+    ]
 
-    concepts_to_keep = set()
-    
+    # build the adjacency indexed by id
+    broader_of = csr(broader_edges)
+    narrower_of = csr([(o, s) for s, o in broader_edges])
+    members_of = csr(member_edges)
 
-    concepts_to_keep.add(desired_top_concept)
+    # identify and keep members of the top concept, including members of nested collections
+    members = bfs([top_id], members_of)
+    members[top_id] = 1
+    seeds = list(compress(range(len(nodes)), members))
 
-    # identify and keep broader terms from desired top conecpts and their ancestors
-    find_broader(skos_graph, desired_top_concept, concepts_to_keep)
+    # identify and keep broader and narrower concepts from the desired top concept, its members and their ancestors / children
+    hierarchy = walk_hierarchy(seeds)
 
-    # identify and keep narrower concepts from the desired top concept and its children
-    find_narrower(skos_graph, desired_top_concept, concepts_to_keep)
+    # translate the ids back to nodes
+    concepts_to_keep = set(compress(nodes, hierarchy))
 
     # identify and keep SKOS collections that are 'narrower' or 'broader'
     collections_to_keep = set()
-    find_collection_members(skos_graph, desired_top_concept, concepts_to_keep)  # Now also finds nested collection members
 
     # set to True if all concept schemes should be kept
     # set to False if only schemes associated with the desired top concept should be kept
     keep_all_schemes = True
 
+    schemes_to_keep = set()
     if keep_all_schemes:
         # Identify and keep all concept schemes
-        schemes_to_keep = set()
-        for scheme in skos_graph.subjects(RDF.type, skos["ConceptScheme"]):
-            schemes_to_keep.add(scheme)
+        schemes_to_keep.update(skos_graph.subjects(RDF.type, _CONCEPT_SCHEME))
     else:
     # find only associated schemes 
     # limited to all schemes that are object of a skos:scheme relation in any of the concepts_to_keep
         for concept in concepts_to_keep:
-            for s, p, o in skos_graph.triples((concept, skos["inScheme"], None)):
-                schemes_to_keep.add(o)  # Add the scheme URIs to the set
+            schemes_to_keep.update(o for _, _, o in skos_graph.triples((concept, _IN_SCHEME, None)))
 
     # Merge concepts and collections and schemes to keep
     elements_to_keep = concepts_to_keep.union(collections_to_keep).union(schemes_to_keep)
 
     # do the actual removal
-    for s, p, o in list(skos_graph.triples((None, None, None))):  # Convert to list to avoid modification issues during iteration
-        """
-        logic explanation
-        drop term if:
-            term is not in elements_to_keep (this usually only is true for the desired top concept)
-            or if
-            term has a broader narrower relation and the term it is related to is not in elements_to_keep
-
-        """
-        if (s not in elements_to_keep) or (p in [skos["broader"], skos["narrower"]] and o not in elements_to_keep):
-            skos_graph.remove((s, p, o))
+    """
+    logic explanation
+    drop term if:
+        term is not in elements_to_keep (this usually only is true for the desired top concept)
+        or if
+        term has a broader narrower relation and the term it is related to is not in elements_to_keep
+
+    """
+    edge_preds = frozenset((_BROADER, _NARROWER))
+    # collect first and remove afterwards to avoid modification issues during iteration
+    to_remove = []
+    for triple in skos_graph:
+        s, p, o = triple
+        if (s not in elements_to_keep) or (p in edge_preds and o not in elements_to_keep):
+            to_remove.append(triple)
+    for triple in to_remove:
+        skos_graph.remove(triple)
 
     # Save the modified SKOS file
-    skos_graph.serialize(destination=output_file, format="xml")
+    with open(output_file, "wb") as out:
+        skos_graph.serialize(destination=out, format=output_format, encoding="utf-8")
     print("saved file as {}".format(output_file))
 
+def _filter_skos_job(job):
+    # module level so it can be pickled for the worker processes
+    return filter_skos(*job)
+
+def filter_skos_batch(jobs, max_workers=None):
+    """
+    arguments:
+    - jobs (required): list of (input_file, output_file, top_concept_uri) tuples, optionally followed by store and output_format, see filter_skos
+    - max_workers (optional): number of worker processes, defaults to the number of CPUs
+
+    return:
+        None
+
+    description:
+    - runs filter_skos for every job in a pool of worker processes, e.g. to cut several vocabularies at once
+    - every worker builds its own graph, so nothing is shared or locked between them
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # consume the results so exceptions raised in a worker are raised here
+        list(executor.map(_filter_skos_job, jobs))
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Filter SKOS hierarchies.')
     parser.add_argument('--input_filename', type=str, required=True, help='The input RDF file path.')
-    parser.add_argument('--output_filename', type=str, help='The output RDF file path. Optional; if not provided, defaults to <input_filename>_reduced.rdf')
+    parser.add_argument('--output_filename', type=str, help='The output RDF file path. Optional; if not provided, defaults to <input_filename>_reduced.rdf (.ttl / .nt for turtle / nt output)')
     parser.add_argument('--top_concept', type=str, required=True, help='The URI of the top concept.')
+    parser.add_argument('--store', type=str, default='default', help='The rdflib store holding the graph. Optional; e.g. "Oxigraph" (requires oxrdflib) for large files, defaults to the in-memory store')
+    parser.add_argument('--output_format', type=str, choices=['xml', 'turtle', 'nt'], default='xml', help='The serialization of the output file. Optional; defaults to xml (RDF/XML), nt needs the least memory on large files')
     
     # Parse the arguments
     args = parser.parse_args()
@@ -117,12 +232,13 @@ if __name__ == "__main__":
     # Determine the output filename
     if not args.output_filename:
         root, ext = splitext(args.input_filename)
+        ext = OUTPUT_EXTENSIONS.get(args.output_format, ext)
         output_filename = "{}_reduced{}".format(root, ext)
     else:
         output_filename = args.output_filename
 
     # Call the function with the specified parameters from command line
-    filter_skos(args.input_filename, output_filename, args.top_concept)
+    filter_skos(args.input_filename, output_filename, args.top_concept, args.store, args.output_format)
 
 
 
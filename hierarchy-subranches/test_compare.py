@@ -0,0 +1,36 @@
+import pytest
+
+import compare
+
+FILE1 = b"a\nb\nshared\nb\nc\r\nonly in 1\n"
+FILE2 = b"shared\nd\na\nonly in 2"
+UNIQUE = [b"b", b"b", b"c", b"only in 1", b"d", b"only in 2"]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    file1 = tmp_path / "file1.txt"
+    file2 = tmp_path / "file2.txt"
+    file1.write_bytes(FILE1)
+    file2.write_bytes(FILE2)
+    return str(file1), str(file2), tmp_path / "unique.txt"
+
+
+def test_find_unique_lines(paths):
+    file1, file2, output = paths
+    compare.find_unique_lines(file1, file2, str(output))
+    assert output.read_bytes().splitlines() == UNIQUE
+
+
+def test_find_unique_lines_parallel(paths, monkeypatch):
+    # the pool path has to give the same result as the serial one
+    file1, file2, output = paths
+    monkeypatch.setattr(compare, "PARALLEL_THRESHOLD", 0)
+    compare.find_unique_lines(file1, file2, str(output), processes=2)
+    assert output.read_bytes().splitlines() == UNIQUE
+
+
+def test_find_unique_lines_sorted(paths):
+    file1, file2, output = paths
+    compare.find_unique_lines_sorted(file1, file2, str(output), chunk_lines=2)
+    assert output.read_bytes().splitlines() == sorted(set(UNIQUE))
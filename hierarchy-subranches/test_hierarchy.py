@@ -0,0 +1,66 @@
+import pytest
+
+rdflib = pytest.importorskip("rdflib")
+
+import hierarchy
+
+EX = rdflib.Namespace("http://example.org/voc/")
+SKOS = hierarchy.SKOS
+
+SKOS_FILE = """
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix ex: <http://example.org/voc/> .
+ex:scheme a skos:ConceptScheme .
+ex:root a skos:Concept ; skos:prefLabel "root"@en ; skos:narrower ex:parent .
+ex:parent a skos:Concept ; skos:broader ex:root ; skos:narrower ex:top , ex:sibling .
+ex:top a skos:Concept ; skos:prefLabel "top"@en ; skos:broader ex:parent ; skos:member ex:collection .
+ex:child a skos:Concept ; skos:broader ex:top .
+ex:grandchild a skos:Concept ; skos:broader ex:child .
+ex:sibling a skos:Concept ; skos:prefLabel "sibling"@en ; skos:broader ex:parent .
+ex:nephew a skos:Concept ; skos:broader ex:sibling .
+ex:collection a skos:Collection ; skos:member ex:member .
+ex:member a skos:Concept ; skos:broader ex:member_parent .
+ex:member_parent a skos:Concept .
+ex:member_child a skos:Concept ; skos:broader ex:member .
+ex:member_sibling a skos:Concept ; skos:broader ex:member_parent .
+ex:other_collection a skos:Collection ; skos:member ex:other .
+ex:other a skos:Concept .
+"""
+
+
+@pytest.fixture
+def filtered(tmp_path):
+    input_file = tmp_path / "input.ttl"
+    input_file.write_text(SKOS_FILE)
+    output_file = tmp_path / "output.ttl"
+    hierarchy.filter_skos(str(input_file), str(output_file), str(EX.top), output_format="turtle")
+    graph = rdflib.Graph()
+    graph.parse(str(output_file), format="turtle")
+    return graph
+
+
+def test_keeps_top_concept_ancestors_and_descendants(filtered):
+    subjects = set(filtered.subjects())
+    assert {EX.top, EX.parent, EX.root, EX.child, EX.grandchild, EX.scheme} <= subjects
+    assert (EX.top, SKOS.prefLabel, rdflib.Literal("top", lang="en")) in filtered
+    assert (EX.grandchild, SKOS.broader, EX.child) in filtered
+    assert (EX.root, SKOS.narrower, EX.parent) in filtered
+
+
+def test_drops_siblings(filtered):
+    subjects = set(filtered.subjects())
+    assert EX.sibling not in subjects
+    assert EX.nephew not in subjects
+    # the edge from a kept concept to the dropped sibling goes as well
+    assert (EX.parent, SKOS.narrower, EX.sibling) not in filtered
+    assert (EX.parent, SKOS.narrower, EX.top) in filtered
+
+
+def test_keeps_nested_collection_members(filtered):
+    subjects = set(filtered.subjects())
+    assert {EX.collection, EX.member, EX.member_parent, EX.member_child} <= subjects
+    assert (EX.collection, SKOS.member, EX.member) in filtered
+    # the hierarchy of a member is walked like that of the top concept
+    assert EX.member_sibling not in subjects
+    assert EX.other_collection not in subjects
+    assert EX.other not in subjects
@@ -1,10 +1,21 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from rdflib import Graph, Namespace, URIRef, RDF, Literal
+from rdflib.util import guess_format
 from os.path import splitext
 
+SKOS = Namespace("http://www.w3.org/2004/02/skos/core#")
+# looked up once at module load instead of going through the namespace on every use
+_BROADER = SKOS["broader"]
+_NARROWER = SKOS["narrower"]
+_PREFLABEL = SKOS["prefLabel"]
 
+# file extension of the default output filename for non RDF/XML output formats
+OUTPUT_EXTENSIONS = {"turtle": ".ttl", "nt": ".nt"}
 
-def filter_language(input_file, output_file, languages, keep_other_lang):
+
+
+def filter_language(input_file, output_file, languages, keep_other_lang, store="default", output_format="xml"):
     """
     Filters SKOS concepts based on language preferences, retaining hierarchical relationships.
 
@@ -21,9 +32,13 @@ def filter_language(input_file, output_file, languages, keep_other_lang):
         keep_other_lang (bool): A flag indicating whether to retain (True) or remove (False) prefLabels in languages
                                 other than those specified. When True, prefLabels in non-specified languages are kept;
                                 when False, they are removed, except for those attached to kept concepts.
+        store (str, optional): rdflib store plugin holding the graph, e.g. "Oxigraph" (requires oxrdflib) for faster
+                               parsing and lower memory use on large files. Defaults to rdflib's in-memory store.
+        output_format (str, optional): rdflib serialization of the output file. Defaults to "xml" (RDF/XML);
+                                       "nt" writes one triple per line and needs the least memory on large files.
 
     Returns:
-        None. The function outputs a new RDF/XML file at the location specified by the `output_file` argument.
+        None. The function outputs a new RDF file (RDF/XML by default) at the location specified by the `output_file` argument.
 
     Side effects:
         Setting keep_other_lang to False can result in terms having no label at all.
@@ -37,26 +52,34 @@ def filter_language(input_file, output_file, languages, keep_other_lang):
         removing all non-English and non-French literals from retained concepts, and save the result to 'output.rdf'.
     """
 
-    skos = Namespace("http://www.w3.org/2004/02/skos/core#")
-
-    # find broader concepts recursively
-    def find_broader(graph, concept, concepts_to_keep):
-        for s, p, o in graph.triples((concept, skos["broader"], None)):
-            concepts_to_keep.add(o)
-            find_broader(graph, o, concepts_to_keep)
-
-
-    skos_graph = Graph()
-    skos_graph.parse(input_file)
+    # find broader concepts iteratively, concepts already kept have had their ancestors added before
+    # _broader is bound as a default argument so the lookup in the loop is local
+    def find_broader(graph, concept, concepts_to_keep, _broader=_BROADER):
+        stack = [concept]
+        while stack:
+            for s, p, o in graph.triples((stack.pop(), _broader, None)):
+                if o not in concepts_to_keep:
+                    concepts_to_keep.add(o)
+                    stack.append(o)
+
+
+    skos_graph = Graph(store=store)
+    input_format = guess_format(input_file)
+    if store.lower() == "oxigraph" and input_format in ("xml", "turtle", "nt"):
+        # parse with oxrdflib's native parser straight into the Oxigraph store
+        skos_graph.parse(input_file, format="ox-" + input_format)
+    else:
+        skos_graph.parse(input_file)
     
     concepts_to_keep = set()
+    lang_set = frozenset(languages)
 
     # Find all terms with a preferred label in specified languages and their parents
-    for term, _, _ in skos_graph.triples((None, skos["prefLabel"], None)):
-        for _, _, label in skos_graph.triples((term, skos["prefLabel"], None)):
-            if label.language in languages:
-                concepts_to_keep.add(term)
-                find_broader(skos_graph, term, concepts_to_keep)
+    # single pass over the prefLabels, each term is only expanded the first time one of its labels matches
+    for term, _, label in skos_graph.triples((None, _PREFLABEL, None)):
+        if getattr(label, "language", None) in lang_set and term not in concepts_to_keep:
+            concepts_to_keep.add(term)
+            find_broader(skos_graph, term, concepts_to_keep)
 
     
 
@@ -70,32 +93,74 @@ def filter_language(input_file, output_file, languages, keep_other_lang):
     if keep_other_lang is set to False:
         remove pref:labels in concepts_to_keep in all other languages but the selected one(s)
     """
-    for s, p, o in list(skos_graph.triples((None, None, None))):  # Convert to list to avoid modification issues during iteration
-        if (s not in concepts_to_keep) or (p in [skos["broader"], skos["narrower"]] and o not in concepts_to_keep):
-            skos_graph.remove((s, p, o))
-
-        # only executed for concepts_to_keep
-        
-        # # only removes prefLabels in another language
-        # # this leads to concepts having no label at all
-        # elif not keep_other_lang: 
-        #     if p == skos["prefLabel"] and s in concepts_to_keep and o.language not in languages:
-        #     # Additionally remove prefLabels in languages not specified to keep
-        #         skos_graph.remove((s, p, o))
-
-        # removes all objects containing a language tag in another language
-        # this leads to concepts having no label at all
-        elif not keep_other_lang:
-            if isinstance(o, Literal) and s in concepts_to_keep and o.language and o.language not in languages:
+    # terms that are not kept lose all their triples, removed by pattern in the store
+    for s in set(skos_graph.subjects()) - concepts_to_keep:
+        skos_graph.remove((s, None, None))
+
+    # only the broader and narrower triples can point to a term that is not kept
+    # collect first and remove afterwards to avoid modification issues during iteration
+    to_remove = [
+        triple
+        for p in (_BROADER, _NARROWER)
+        for triple in skos_graph.triples((None, p, None))
+        if triple[2] not in concepts_to_keep
+    ]
+
+    # # only removes prefLabels in another language
+    # # this leads to concepts having no label at all
+    # if not keep_other_lang:
+    #     for triple in skos_graph.triples((None, _PREFLABEL, None)):
+    #         if triple[2].language not in languages:
+    #         # Additionally remove prefLabels in languages not specified to keep
+    #             to_remove.append(triple)
+
+    # removes all objects containing a language tag in another language
+    # this leads to concepts having no label at all
+    # only the triples of concepts_to_keep are left at this point
+    if not keep_other_lang:
+        for triple in skos_graph:
+            o = triple[2]
+            if type(o) is Literal and o.language and o.language not in lang_set:
             # Additionally remove prefLabels in languages not specified to keep
-                skos_graph.remove((s, p, o))
+                to_remove.append(triple)
+
+    for triple in to_remove:
+        skos_graph.remove(triple)
 
 
     # Save the modified SKOS file
-    skos_graph.serialize(destination=output_file, format="xml")
+    with open(output_file, "wb") as out:
+        skos_graph.serialize(destination=out, format=output_format, encoding="utf-8")
     print("saved file as {}".format(output_file))
 
 
+def _filter_language_job(job):
+    # module level so it can be pickled for the worker processes
+    return filter_language(*job)
+
+
+def filter_language_batch(jobs, max_workers=None):
+    """
+    Runs filter_language for a batch of files in a pool of worker processes.
+
+    Every worker builds its own graph, so nothing is shared or locked between them.
+
+    Args:
+        jobs (list of tuple): (input_file, output_file, languages, keep_other_lang) tuples, optionally followed by
+                              store and output_format, see filter_language.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        None.
+
+    Example Usage:
+        filter_language_batch([("a.rdf", "a_en.rdf", ["en"], True), ("b.rdf", "b_en.rdf", ["en"], True)])
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # consume the results so exceptions raised in a worker are raised here
+        list(executor.map(_filter_language_job, jobs))
+
+
 
 
 
@@ -105,6 +170,8 @@ if __name__ == "__main__":
     parser.add_argument('--output_filename', type=str, help='Output RDF/XML file')
     parser.add_argument('--languages', nargs='+', required=True, help='List of language tags to keep')
     parser.add_argument('--keep_other_lang', type=str, choices=['True', 'False'], nargs='?', const='True', default='True', help='Whether to retain prefLabels in languages other than the specified ones, can be "True" or "False"' )
+    parser.add_argument('--store', type=str, default='default', help='rdflib store holding the graph, e.g. "Oxigraph" (requires oxrdflib) for large files')
+    parser.add_argument('--output_format', type=str, choices=['xml', 'turtle', 'nt'], default='xml', help='Serialization of the output file, nt needs the least memory on large files')
     args = parser.parse_args()
     # convert argparse string to bool
     args.keep_other_lang = args.keep_other_lang == 'True'
@@ -112,6 +179,7 @@ if __name__ == "__main__":
     # Determine the output filename
     if not args.output_filename:
         root, ext = splitext(args.input_filename)
+        ext = OUTPUT_EXTENSIONS.get(args.output_format, ext)
         if args.keep_other_lang:
             output_filename = f"{root}_{'_'.join(args.languages)}{ext}" # this results in original file name with all languages appended
         else:
@@ -120,4 +188,4 @@ if __name__ == "__main__":
     else:
         output_filename = args.output_filename
 
-    filter_language(args.input_filename, output_filename, args.languages, args.keep_other_lang)
+    filter_language(args.input_filename, output_filename, args.languages, args.keep_other_lang, args.store, args.output_format)
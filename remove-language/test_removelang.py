@@ -0,0 +1,69 @@
+import pytest
+
+rdflib = pytest.importorskip("rdflib")
+
+import removelang
+
+EX = rdflib.Namespace("http://example.org/voc/")
+SKOS = removelang.SKOS
+
+SKOS_FILE = """
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix ex: <http://example.org/voc/> .
+ex:root a skos:Concept ; skos:prefLabel "Wurzel"@de ; skos:narrower ex:parent .
+ex:parent a skos:Concept ; skos:prefLabel "Eltern"@de ; skos:broader ex:root ; skos:narrower ex:english .
+ex:english a skos:Concept ;
+    skos:prefLabel "english"@en , "anglais"@fr ;
+    skos:definition "en anglais"@fr ;
+    skos:notation "1" ;
+    skos:broader ex:parent ;
+    skos:narrower ex:french .
+ex:french a skos:Concept ; skos:prefLabel "français"@fr ; skos:altLabel "french"@en ; skos:broader ex:english .
+ex:untagged a skos:Concept ; skos:prefLabel "untagged" .
+"""
+
+
+def filter_file(tmp_path, keep_other_lang):
+    input_file = tmp_path / "input.ttl"
+    input_file.write_text(SKOS_FILE, encoding="utf-8")
+    output_file = tmp_path / "output.ttl"
+    removelang.filter_language(str(input_file), str(output_file), ["en"], keep_other_lang, output_format="turtle")
+    graph = rdflib.Graph()
+    graph.parse(str(output_file), format="turtle")
+    return graph
+
+
+@pytest.mark.parametrize("keep_other_lang", [True, False])
+def test_keeps_labelled_concepts_and_their_ancestors(tmp_path, keep_other_lang):
+    graph = filter_file(tmp_path, keep_other_lang)
+    assert set(graph.subjects()) == {EX.english, EX.parent, EX.root}
+    assert (EX.english, SKOS.prefLabel, rdflib.Literal("english", lang="en")) in graph
+    assert (EX.english, SKOS.notation, rdflib.Literal("1")) in graph
+    assert (EX.english, SKOS.broader, EX.parent) in graph
+    assert (EX.root, SKOS.narrower, EX.parent) in graph
+
+
+@pytest.mark.parametrize("keep_other_lang", [True, False])
+def test_removes_terms_that_are_not_kept(tmp_path, keep_other_lang):
+    graph = filter_file(tmp_path, keep_other_lang)
+    # the literals of a term that is not kept go, even those in a kept language
+    assert not list(graph.triples((EX.french, None, None)))
+    assert (None, None, rdflib.Literal("french", lang="en")) not in graph
+    assert not list(graph.triples((EX.untagged, None, None)))
+    # as does the narrower edge of a kept concept pointing to it
+    assert (EX.english, SKOS.narrower, EX.french) not in graph
+
+
+def test_keep_other_lang(tmp_path):
+    graph = filter_file(tmp_path, True)
+    assert (EX.english, SKOS.prefLabel, rdflib.Literal("anglais", lang="fr")) in graph
+    assert (EX.english, SKOS.definition, rdflib.Literal("en anglais", lang="fr")) in graph
+    assert (EX.parent, SKOS.prefLabel, rdflib.Literal("Eltern", lang="de")) in graph
+
+
+def test_remove_other_lang(tmp_path):
+    graph = filter_file(tmp_path, False)
+    languages = {o.language for o in graph.objects() if isinstance(o, rdflib.Literal)}
+    assert languages == {"en", None}
+    # ancestors kept for the hierarchy can be left without a label
+    assert not list(graph.triples((EX.parent, SKOS.prefLabel, None)))